@@ -0,0 +1,86 @@
+"""Streaming exports of a user's data.
+
+Rows are read with ``QuerySet.iterator()`` and serialized by generators, so
+memory use stays flat however much the account has posted. The same chunks
+feed both ``StreamingHttpResponse`` and the ``export_user_data`` command.
+"""
+
+import csv
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from tweets.models import ArchivedTweet, Tweet
+
+CHUNK_SIZE = 2000
+# Serialized rows are joined into chunks of about this many bytes.
+BUFFER_SIZE = 64 * 1024
+
+FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+
+
+def tweet_rows(user, chunk_size):
+    for model in (Tweet, ArchivedTweet):
+        queryset = model.objects.filter(user=user).order_by("-created_at")
+        yield from queryset.values_list("id", "content", "created_at").iterator(chunk_size=chunk_size)
+
+
+# dataset name -> (column names, row generator)
+DATASETS = {
+    "tweets": (("id", "content", "created_at"), tweet_rows),
+}
+
+
+class _Echo:
+    """File-like object whose ``write`` hands back what it was given, for ``csv.writer``."""
+
+    def write(self, value):
+        return value
+
+
+def _serialize(fields, rows, fmt):
+    if fmt == "csv":
+        writer = csv.writer(_Echo())
+        yield writer.writerow(fields)
+        for row in rows:
+            yield writer.writerow(row)
+    else:
+        for row in rows:
+            yield json.dumps(dict(zip(fields, row)), cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+
+
+def _buffer(lines):
+    parts, size = [], 0
+    for line in lines:
+        data = line.encode()
+        parts.append(data)
+        size += len(data)
+        if size >= BUFFER_SIZE:
+            yield b"".join(parts)
+            parts, size = [], 0
+    if parts:
+        yield b"".join(parts)
+
+
+def _gzip(chunks):
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_chunks(user, dataset, fmt="csv", compress=False, chunk_size=CHUNK_SIZE):
+    """Yield the export of ``dataset`` for ``user`` as byte chunks."""
+    fields, rows = DATASETS[dataset]
+    chunks = _buffer(_serialize(fields, rows(user, chunk_size), fmt))
+    return _gzip(chunks) if compress else chunks
+
+
+def export_filename(user, dataset, fmt, compress=False):
+    return "%s-%s.%s%s" % (user.username, dataset, fmt, ".gz" if compress else "")
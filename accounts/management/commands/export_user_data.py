@@ -0,0 +1,42 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.exports import CHUNK_SIZE, DATASETS, FORMATS, export_chunks, export_filename
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Stream a user's data to a CSV or JSON Lines file without loading it into memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("username")
+        parser.add_argument("--dataset", choices=sorted(DATASETS), default="tweets")
+        parser.add_argument("--format", choices=sorted(FORMATS), default="csv")
+        parser.add_argument("--gzip", action="store_true", help="Compress the output with gzip.")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows fetched per database round trip.")
+        parser.add_argument(
+            "-o", "--output", help="Output file, or '-' for stdout. Defaults to <username>-<dataset>.<format>."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options["username"])
+        except User.DoesNotExist:
+            raise CommandError("User '%s' does not exist." % options["username"])
+
+        chunks = export_chunks(
+            user, options["dataset"], options["format"], compress=options["gzip"], chunk_size=options["chunk_size"]
+        )
+        output = options["output"] or export_filename(user, options["dataset"], options["format"], options["gzip"])
+        if output == "-":
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+        with open(output, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        self.stderr.write("Exported %s's %s to %s" % (user.username, options["dataset"], output))
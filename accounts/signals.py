@@ -0,0 +1,15 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .usernames import username_index
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def add_username_to_index(sender, instance, created, update_fields, **kwargs):
+    # Later saves may rename the user, but (like last_login on every login)
+    # must not count as new names.
+    if created or update_fields is None or "username" in update_fields:
+        username_index.add(instance.username, count=created)
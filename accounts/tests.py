@@ -1,7 +1,26 @@
+import asyncio
+import csv
+import gzip
+import json
+import os
+import tempfile
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
 from django.conf import settings
 from django.contrib.auth import SESSION_KEY, get_user_model
-from django.test import TestCase
+from django.core.management import call_command
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.test import SimpleTestCase, TestCase
 from django.urls import reverse
+from django.utils import timezone
+
+from tweets.models import ArchivedTweet, Tweet
+
+from .usernames import REBUILD_INTERVAL, BloomFilter, username_index
 
 User = get_user_model()
 
@@ -172,6 +191,73 @@ class TestSignUpView(TestCase):
         self.assertEqual(form.errors["password2"], ["確認用パスワードが一致しません。"])
 
 
+class TestUsernameAvailabilityView(TestCase):
+    def setUp(self):
+        username_index.reset()
+        User.objects.create_user(username="taken", email="test@example.com", password="testuser")
+
+    def get(self, username):
+        return self.client.get(reverse("accounts:username_availability"), {"username": username}).json()
+
+    def test_success_get_with_available_username(self):
+        with self.assertNumQueries(2):
+            self.assertTrue(self.get("free")["available"])
+        with self.assertNumQueries(0):
+            self.assertTrue(self.get("other")["available"])
+
+    def test_success_get_with_taken_username(self):
+        self.assertFalse(self.get("taken")["available"])
+
+    def test_success_get_with_taken_username_and_whitespace(self):
+        self.assertFalse(self.get(" taken ")["available"])
+
+    def test_success_get_with_taken_username_in_fullwidth(self):
+        data = self.get("ｔａｋｅｎ")
+        self.assertEqual(data["username"], "taken")
+        self.assertFalse(data["available"])
+
+    def test_success_get_with_user_created_after_build(self):
+        self.get("taken")
+        User.objects.create_user(username="new", email="test@example.com", password="testuser")
+        self.assertFalse(self.get("new")["available"])
+
+    def test_success_get_with_user_renamed_after_build(self):
+        self.get("taken")
+        user = User.objects.get(username="taken")
+        user.username = "renamed"
+        user.save()
+        self.assertFalse(self.get("renamed")["available"])
+
+    def test_success_get_with_user_renamed_by_other_process(self):
+        self.get("taken")
+        # A queryset update sends no signal, like a save in another worker.
+        User.objects.filter(username="taken").update(username="renamed")
+        with mock.patch("accounts.usernames.time.monotonic", return_value=time.monotonic() + REBUILD_INTERVAL + 1):
+            self.assertFalse(self.get("renamed")["available"])
+
+    def test_login_does_not_grow_index(self):
+        self.get("taken")
+        count = username_index._filter.count
+        self.client.login(username="taken", password="testuser")
+        self.assertEqual(username_index._filter.count, count)
+
+    def test_failure_get_with_invalid_username(self):
+        data = self.get("")
+        self.assertFalse(data["available"])
+        self.assertEqual(data["errors"], ["このフィールドは必須です。"])
+
+
+class TestBloomFilter(SimpleTestCase):
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000)
+        names = ["user%d" % i for i in range(1000)]
+        for name in names:
+            bloom.add(name)
+        self.assertTrue(all(name in bloom for name in names))
+        false_positives = sum("other%d" % i in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
 class TestLoginView(TestCase):
     def setUp(self):
         User.objects.create_user(username="test", email="test@example.com", password="testuser")
@@ -241,8 +327,22 @@ class TestLogoutView(TestCase):
 
 
 class TestUserProfileView(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="test", email="test@example.com", password="testuser")
+        self.client.force_login(self.user)
+
     def test_success_get(self):
-        pass
+        tweet = Tweet.objects.create(user=self.user, content="new")
+        archived = ArchivedTweet.objects.create(id=100, user=self.user, content="old", created_at=timezone.now())
+        response = self.client.get(reverse("accounts:user_profile", kwargs={"username": "test"}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["tweets"]), [tweet, archived])
+        self.assertFalse(response.context["has_next"])
+
+    def test_failure_get_with_invalid_page(self):
+        for page in ("x", "99999999999999999999"):
+            response = self.client.get(reverse("accounts:user_profile", kwargs={"username": "test"}), {"page": page})
+            self.assertEqual(response.status_code, 404)
 
 
 class TestUserProfileEditView(TestCase):
@@ -289,3 +389,73 @@ class TestFollowingListView(TestCase):
 class TestFollowerListView(TestCase):
     def test_success_get(self):
         pass
+
+
+class TestExportView(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="test", email="test@example.com", password="testuser")
+        self.client.force_login(self.user)
+        self.tweet = Tweet.objects.create(user=self.user, content="new")
+        self.archived = ArchivedTweet.objects.create(
+            id=100, user=self.user, content="old, archived", created_at=timezone.now() - timedelta(days=100)
+        )
+
+    def get(self, **params):
+        return self.client.get(reverse("accounts:export", kwargs={"username": "test"}), params)
+
+    def test_success_get_csv(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="test-tweets.csv"')
+        rows = list(csv.reader(b"".join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0], ["id", "content", "created_at"])
+        self.assertEqual([row[:2] for row in rows[1:]], [[str(self.tweet.pk), "new"], ["100", "old, archived"]])
+
+    def test_success_get_gzipped_jsonl(self):
+        response = self.get(format="jsonl", gzip="1")
+        self.assertEqual(response.status_code, 200)
+        lines = gzip.decompress(b"".join(response.streaming_content)).decode().splitlines()
+        self.assertEqual([json.loads(line)["content"] for line in lines], ["new", "old, archived"])
+
+    def test_failure_get_with_unknown_dataset(self):
+        self.assertEqual(self.get(dataset="passwords").status_code, 400)
+
+    def test_failure_get_with_incorrect_user(self):
+        User.objects.create_user(username="other", email="other@example.com", password="testuser")
+        response = self.client.get(reverse("accounts:export", kwargs={"username": "other"}))
+        self.assertEqual(response.status_code, 403)
+
+    async def test_success_get_through_asgi(self):
+        from mysite.asgi import application
+
+        # As in the test client, keep the test transaction's connection open.
+        for signal in (request_started, request_finished):
+            signal.disconnect(close_old_connections)
+            self.addCleanup(signal.connect, close_old_connections)
+        cookie = "%s=%s" % (settings.SESSION_COOKIE_NAME, self.client.cookies[settings.SESSION_COOKIE_NAME].value)
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": reverse("accounts:export", kwargs={"username": "test"}),
+            "query_string": b"format=jsonl",
+            "headers": [(b"cookie", cookie.encode()), (b"host", b"testserver")],
+        }
+        received = asyncio.Queue()
+        await received.put({"type": "http.request", "body": b""})
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        await asyncio.wait_for(application(scope, received.get, send), timeout=10)
+        self.assertEqual(sent[0]["status"], 200)
+        lines = b"".join(message.get("body", b"") for message in sent[1:]).decode().splitlines()
+        self.assertEqual([json.loads(line)["content"] for line in lines], ["new", "old, archived"])
+
+    def test_success_export_command(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "tweets.jsonl")
+            call_command("export_user_data", "test", "--format=jsonl", "--output", path, stderr=StringIO())
+            with open(path) as f:
+                self.assertEqual([json.loads(line)["id"] for line in f], [self.tweet.pk, 100])
@@ -0,0 +1,100 @@
+"""In-process index of taken usernames for the signup availability check.
+
+A bloom filter answers "definitely free" without touching the database; only
+possible hits are confirmed with a query. The filter is built on first use,
+fed by ``post_save`` for users created or renamed in this process, and picks
+up users created by other workers by polling for primary keys above the last
+one seen. Renames in other workers are picked up by a periodic rebuild.
+"""
+
+import hashlib
+import math
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+
+# Seconds between polls for users created by other processes.
+REFRESH_INTERVAL = 10
+# Seconds between full rebuilds, which pick up users renamed by other processes.
+REBUILD_INTERVAL = 300
+
+User = get_user_model()
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.num_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # Kirsch-Mitzenmacher: derive every index from two 64-bit hashes.
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item, count=True):
+        """Set ``item``'s bits; with ``count=False`` it does not count towards ``capacity``."""
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        if count:
+            self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class UsernameIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._max_pk = 0
+        self._refreshed_at = 0.0
+        self._built_at = 0.0
+
+    def _rebuild(self):
+        usernames = User.objects.order_by("pk").values_list("pk", "username")
+        self._filter = BloomFilter(capacity=2 * usernames.count() + 1000)
+        self._max_pk = 0
+        self._load(usernames.iterator())
+        self._built_at = self._refreshed_at
+
+    def _load(self, rows):
+        for pk, username in rows:
+            self._filter.add(username)
+            self._max_pk = max(self._max_pk, pk)
+        self._refreshed_at = time.monotonic()
+
+    def _refresh(self):
+        with self._lock:
+            if (
+                self._filter is None
+                or self._filter.count > self._filter.capacity
+                or time.monotonic() - self._built_at > REBUILD_INTERVAL
+            ):
+                self._rebuild()
+            elif time.monotonic() - self._refreshed_at > REFRESH_INTERVAL:
+                self._load(User.objects.filter(pk__gt=self._max_pk).values_list("pk", "username"))
+
+    def add(self, username, count=True):
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(username, count=count)
+
+    def reset(self):
+        with self._lock:
+            self._filter = None
+
+    def is_taken(self, username):
+        self._refresh()
+        if username not in self._filter:
+            return False
+        return User.objects.filter(username=username).exists()
+
+
+username_index = UsernameIndex()
@@ -1,11 +1,17 @@
 from django.conf import settings
 from django.contrib.auth import authenticate, get_user_model, login
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.http import Http404, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse_lazy
 from django.views import generic
 
+from tweets.archive import TWEETS_PER_PAGE, user_tweets_page
+
+from .exports import DATASETS, FORMATS, export_chunks, export_filename
 from .forms import SignUpForm
+from .usernames import username_index
 
 User = get_user_model()
 
@@ -25,6 +31,19 @@ class SignUpView(generic.CreateView):
         return response
 
 
+class UsernameAvailabilityView(generic.View):
+    """Answer "is this username free?" while the signup form is being typed."""
+
+    def get(self, request, *args, **kwargs):
+        username = request.GET.get("username", "")
+        try:
+            # Normalized the way signup does it: the field strips, the model NFKC-normalizes.
+            username = User.normalize_username(SignUpForm.base_fields["username"].clean(username))
+        except ValidationError as e:
+            return JsonResponse({"username": username, "available": False, "errors": e.messages})
+        return JsonResponse({"username": username, "available": not username_index.is_taken(username)})
+
+
 class UserProfileView(LoginRequiredMixin, generic.TemplateView):
     template_name = "accounts/profile.html"
 
@@ -32,4 +51,32 @@ class UserProfileView(LoginRequiredMixin, generic.TemplateView):
         ctx = super().get_context_data(**kwargs)
         user = get_object_or_404(User, username=self.kwargs["username"])
         ctx["username"] = user.username
+        try:
+            page = max(int(self.request.GET.get("page", 1)), 1)
+        except ValueError:
+            raise Http404("Invalid page.")
+        # The page's LIMIT/OFFSET must fit in a signed 64-bit integer.
+        if page * TWEETS_PER_PAGE >= 2**63 - 1:
+            raise Http404("Invalid page.")
+        ctx["tweets"], ctx["has_next"] = user_tweets_page(user, page)
+        ctx["page"] = page
         return ctx
+
+
+class ExportView(LoginRequiredMixin, generic.View):
+    def get(self, request, *args, **kwargs):
+        user = get_object_or_404(User, username=self.kwargs["username"])
+        if user != request.user and not request.user.is_staff:
+            raise PermissionDenied
+        dataset = request.GET.get("dataset", "tweets")
+        fmt = request.GET.get("format", "csv")
+        if dataset not in DATASETS or fmt not in FORMATS:
+            return HttpResponseBadRequest()
+        compress = request.GET.get("gzip") == "1"
+        response = StreamingHttpResponse(
+            export_chunks(user, dataset, fmt, compress=compress),
+            content_type="application/gzip" if compress else FORMATS[fmt],
+        )
+        filename = export_filename(user, dataset, fmt, compress)
+        response["Content-Disposition"] = 'attachment; filename="%s"' % filename
+        return response
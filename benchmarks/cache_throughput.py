@@ -0,0 +1,79 @@
+"""Compare cache throughput and hit rate across worker processes.
+
+Each process runs a read-mostly workload over a skewed key space, filling the
+cache on a miss the way a view would. With ``LocMemCache`` every worker warms
+its own copy; with ``SharedMemoryCache`` they share one.
+
+    python benchmarks/cache_throughput.py --processes 4 --seconds 5
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mysite.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.cache.backends.locmem import LocMemCache  # noqa: E402
+
+from mysite.cache import SharedMemoryCache  # noqa: E402
+
+VALUE = {"username": "user", "tweets": list(range(50))}
+
+
+def worker(make_cache, seconds, num_keys, results):
+    cache = make_cache()
+    rng = random.Random(os.getpid())
+    ops = hits = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        key = "profile:%d" % int(rng.paretovariate(1.2) * 10 % num_keys)
+        if cache.get(key) is None:
+            cache.set(key, VALUE)
+        else:
+            hits += 1
+        ops += 1
+    results.put((ops, hits))
+
+
+def run(name, make_cache, args):
+    ctx = multiprocessing.get_context("fork")
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=worker, args=(make_cache, args.seconds, args.keys, results)) for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    totals = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    ops = sum(t[0] for t in totals)
+    hits = sum(t[1] for t in totals)
+    print("%-18s %12.0f ops/s %8.1f%% hits" % (name, ops / args.seconds, 100 * hits / ops))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--keys", type=int, default=20000)
+    parser.add_argument("--entries", type=int, default=4096)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        location = os.path.join(tmpdir, "cache")
+        options = {"OPTIONS": {"MAX_ENTRIES": args.entries}}
+        run("LocMemCache", lambda: LocMemCache("bench", options), args)
+        run("SharedMemoryCache", lambda: SharedMemoryCache(location, options), args)
+
+
+if __name__ == "__main__":
+    main()
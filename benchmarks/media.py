@@ -0,0 +1,86 @@
+"""Measure attachment upload throughput and serving latency.
+
+Runs against a throwaway database and media directory through Django's test
+client, so it measures the application side (chunked upload handling, file
+moves, FileResponse) rather than a particular web server.
+
+    python benchmarks/media.py --size-mb 50 --requests 200
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mysite.settings")
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+TMPDIR = tempfile.TemporaryDirectory()
+settings.DATABASES["default"]["NAME"] = os.path.join(TMPDIR.name, "db.sqlite3")
+settings.MEDIA_ROOT = os.path.join(TMPDIR.name, "media")
+settings.CACHES["default"]["LOCATION"] = os.path.join(TMPDIR.name, "cache")
+settings.TWEET_ATTACHMENT_MAX_SIZE = sys.maxsize
+settings.ALLOWED_HOSTS = ["testserver"]
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from tweets.models import Attachment, Tweet  # noqa: E402
+
+
+def timed_get(client, url, **headers):
+    start = time.perf_counter()
+    response = client.get(url, **headers)
+    for _ in response.streaming_content:
+        pass
+    response.close()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=100)
+    args = parser.parse_args()
+
+    call_command("migrate", verbosity=0)
+    user = get_user_model().objects.create_user(username="bench", password="bench")
+    tweet = Tweet.objects.create(user=user, content="bench")
+    client = Client()
+    client.force_login(user)
+
+    upload_path = os.path.join(TMPDIR.name, "upload.bin")
+    with open(upload_path, "wb") as f:
+        f.write(os.urandom(args.size_mb * 1024 * 1024))
+    with open(upload_path, "rb") as f:
+        start = time.perf_counter()
+        client.post(reverse("tweets:attachment_create", kwargs={"pk": tweet.pk}), {"file": f})
+        elapsed = time.perf_counter() - start
+    print("upload: %d MB in %.2f s (%.0f MB/s)" % (args.size_mb, elapsed, args.size_mb / elapsed))
+
+    url = reverse("tweets:attachment", kwargs={"pk": Attachment.objects.get().pk})
+    cases = [
+        ("full file", {}),
+        ("first 64 KiB", {"HTTP_RANGE": "bytes=0-65535"}),
+        ("last 64 KiB", {"HTTP_RANGE": "bytes=-65536"}),
+    ]
+    for name, headers in cases:
+        timings = [timed_get(client, url, **headers) for _ in range(args.requests)]
+        print("GET %-14s median %7.2f ms  p95 %7.2f ms" % (name, *(t * 1000 for t in percentiles(timings))))
+    TMPDIR.cleanup()
+
+
+def percentiles(timings):
+    return statistics.median(timings), statistics.quantiles(timings, n=20)[-1]
+
+
+if __name__ == "__main__":
+    main()
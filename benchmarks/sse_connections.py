@@ -0,0 +1,84 @@
+"""Measure idle live-timeline connections per worker.
+
+Opens N event streams in one event loop (what one ASGI worker would hold),
+reports the memory each idle connection costs, then publishes a tweet ID
+and times how long it takes to reach every connection.
+
+    python benchmarks/sse_connections.py --connections 10000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mysite.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+
+from tweets.pubsub import broker  # noqa: E402
+from tweets.stream import stream_events  # noqa: E402
+
+
+async def run(connections):
+    disconnect = asyncio.Event()
+    delivered = 0
+    all_delivered = asyncio.Event()
+
+    async def receive():
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal delivered
+        if message.get("body", b"").startswith(b"data:"):
+            delivered += 1
+            if delivered == connections:
+                all_delivered.set()
+
+    async def connection():
+        subscription = broker.subscribe()
+        try:
+            await stream_events(receive, send, subscription)
+        finally:
+            broker.unsubscribe(subscription)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tasks = [asyncio.ensure_future(connection()) for _ in range(connections)]
+    await asyncio.sleep(0.5)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    used = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+    start = time.perf_counter()
+    broker.publish(1)
+    await all_delivered.wait()
+    fan_out = time.perf_counter() - start
+
+    disconnect.set()
+    await asyncio.gather(*tasks)
+    print("%d idle connections, %.1f KiB each" % (connections, used / connections / 1024))
+    print("fan-out of one tweet to all connections: %.1f ms" % (fan_out * 1000))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connections", type=int, default=1000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        settings.TWEET_STREAM_DIR = tmpdir
+        settings.TWEET_STREAM_HEARTBEAT = 3600
+        asyncio.run(run(args.connections))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Measure process startup time for each settings profile.
+
+Every run is a fresh interpreter doing ``django.setup()``, which is what a
+management command or a freshly forked worker pays before its first job.
+
+    python benchmarks/startup.py --runs 20
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CODE = "import sys, django; django.setup(); print(len(sys.modules))"
+
+
+def measure(settings_module, runs):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", CODE], cwd=BASE_DIR, env=env, check=True, capture_output=True, text=True
+        ).stdout
+        timings.append(time.perf_counter() - start)
+    return timings, int(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("settings", nargs="*", default=["mysite.settings", "mysite.settings_batch"])
+    args = parser.parse_args()
+
+    print("%-24s %10s %10s %8s" % ("settings", "median ms", "min ms", "modules"))
+    for settings_module in args.settings:
+        timings, modules = measure(settings_module, args.runs)
+        print(
+            "%-24s %10.1f %10.1f %8d"
+            % (settings_module, statistics.median(timings) * 1000, min(timings) * 1000, modules)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -9,8 +9,23 @@ https://docs.djangoproject.com/en/4.0/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mysite.settings")
 
-application = get_asgi_application()
+# Same as get_asgi_application(), with a handler that streams responses off
+# the event loop.
+django.setup(set_prefix=False)
+
+from mysite.handlers import ASGIHandler  # noqa: E402
+
+django_application = ASGIHandler()
+
+# Imported after setup; the live timeline bypasses Django's request cycle.
+from tweets.stream import STREAM_PATH, tweet_stream  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "http" and scope["path"] == STREAM_PATH:
+        return await tweet_stream(scope, receive, send)
+    return await django_application(scope, receive, send)
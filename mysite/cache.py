@@ -0,0 +1,284 @@
+"""Cache backend shared by every worker process on one host.
+
+Entries live in a memory-mapped file laid out as a set-associative hash table
+of fixed-size slots. Reads are lock-free (each slot carries a sequence counter
+that writers make odd while they update it), writes are serialized with a
+``flock`` on the backing file, and eviction uses the CLOCK algorithm within a
+set. Values that do not fit in a slot are simply not cached. The file name is
+``LOCATION`` suffixed with the format version and layout options.
+
+    CACHES = {
+        "default": {
+            "BACKEND": "mysite.cache.SharedMemoryCache",
+            "LOCATION": "/dev/shm/mysite.cache",
+            "OPTIONS": {"MAX_ENTRIES": 4096, "SLOT_SIZE": 4096, "WAYS": 8},
+        }
+    }
+"""
+
+import fcntl
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+MAGIC = b"DJSM"
+FORMAT_VERSION = 1
+
+# magic, format version, number of slots, slot size, ways per set
+FILE_HEADER = struct.Struct("=4sIIII")
+# sequence, key hash, expiry (0 = never), key length (0 = empty), value length
+SLOT_HEADER = struct.Struct("=QQdII")
+SEQ = struct.Struct("=Q")
+REF_OFFSET = SLOT_HEADER.size
+PAYLOAD_OFFSET = SLOT_HEADER.size + 8
+
+# A reader gives up (and reports a miss) after this many torn reads, so a
+# writer that died mid-update cannot wedge the readers of its slot.
+MAX_READ_RETRIES = 100
+
+# Mappings are shared by every cache instance (one per thread) of a process.
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+class _Table:
+    def __init__(self, path, num_slots, slot_size, ways):
+        self.path = path
+        self.pid = os.getpid()
+        self.num_slots = num_slots
+        self.slot_size = slot_size
+        self.ways = ways
+        self.num_sets = num_slots // ways
+        self.size = FILE_HEADER.size + num_slots * slot_size
+        self.lock = threading.Lock()
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+            expected = FILE_HEADER.pack(MAGIC, FORMAT_VERSION, num_slots, slot_size, ways)
+            size = os.fstat(self.fd).st_size
+            # Other processes may have an existing file mapped, so it is never
+            # emptied or resized here: that would SIGBUS their next access.
+            if size == 0:
+                os.ftruncate(self.fd, self.size)
+                os.pwrite(self.fd, expected, 0)
+            elif size != self.size or os.pread(self.fd, FILE_HEADER.size, 0) != expected:
+                raise ValueError("%s is not a cache file with the configured layout." % path)
+            self.mm = mmap.mmap(self.fd, self.size)
+        except BaseException:
+            # Closing the descriptor also releases the lock.
+            os.close(self.fd)
+            raise
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+
+def _get_table(path, num_slots, slot_size, ways):
+    key = (path, num_slots, slot_size, ways)
+    with _tables_lock:
+        table = _tables.get(key)
+        # flock() locks belong to the open file description, which a forked
+        # child shares with its parent, so each process opens its own.
+        if table is None or table.pid != os.getpid():
+            table = _tables[key] = _Table(path, num_slots, slot_size, ways)
+        return table
+
+
+class SharedMemoryCache(BaseCache):
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self._location = str(location)
+        self._slot_size = int(options.get("SLOT_SIZE", 4096))
+        self._ways = int(options.get("WAYS", 8))
+        if self._slot_size <= PAYLOAD_OFFSET:
+            raise ValueError("SLOT_SIZE must be larger than %d bytes." % PAYLOAD_OFFSET)
+        # Round up so every set is full.
+        self._num_slots = -(-self._max_entries // self._ways) * self._ways
+
+    @property
+    def _path(self):
+        # Each layout gets its own file, so workers started with different
+        # options (e.g. during a rolling deploy) never share a mapping.
+        return "%s.v%d-%d-%d-%d" % (self._location, FORMAT_VERSION, self._num_slots, self._slot_size, self._ways)
+
+    @property
+    def _table(self):
+        return _get_table(self._path, self._num_slots, self._slot_size, self._ways)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        pickled = pickle.dumps(value, self.pickle_protocol)
+        with self._write_lock() as table:
+            if self._lookup(table, key)[0] is not None:
+                return False
+            return self._store(table, key, pickled, self.get_backend_timeout(timeout))
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        pickled = self._lookup(self._table, key)[0]
+        if pickled is None:
+            return default
+        return pickle.loads(pickled)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        pickled = pickle.dumps(value, self.pickle_protocol)
+        with self._write_lock() as table:
+            if not self._store(table, key, pickled, self.get_backend_timeout(timeout)):
+                # Too large to cache; never serve the previous value instead.
+                self._delete(table, key)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._write_lock() as table:
+            pickled = self._lookup(table, key)[0]
+            if pickled is None:
+                return False
+            return self._store(table, key, pickled, self.get_backend_timeout(timeout))
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._write_lock() as table:
+            pickled, expires = self._lookup(table, key)
+            if pickled is None:
+                raise ValueError("Key '%s' not found" % key)
+            new_value = pickle.loads(pickled) + delta
+            self._store(table, key, pickle.dumps(new_value, self.pickle_protocol), expires or None)
+        return new_value
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._lookup(self._table, key)[0] is not None
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._write_lock() as table:
+            return self._delete(table, key)
+
+    def clear(self):
+        with self._write_lock() as table:
+            for slot in range(table.num_slots):
+                offset = self._slot_offset(table, slot)
+                if SLOT_HEADER.unpack_from(table.mm, offset)[3]:
+                    self._write_slot(table, offset, 0, 0.0, b"", b"")
+
+    def _write_lock(self):
+        return _WriteLock(self._table)
+
+    @staticmethod
+    def _hash(key):
+        return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+    @staticmethod
+    def _slot_offset(table, slot):
+        return FILE_HEADER.size + slot * table.slot_size
+
+    def _set_offsets(self, table, key_hash):
+        first = (key_hash % table.num_sets) * table.ways
+        return [self._slot_offset(table, slot) for slot in range(first, first + table.ways)]
+
+    def _lookup(self, table, key):
+        """Return ``(pickled value, expiry)``, or ``(None, None)`` on a miss."""
+        key = key.encode()
+        key_hash = self._hash(key)
+        mm = table.mm
+        for offset in self._set_offsets(table, key_hash):
+            for _ in range(MAX_READ_RETRIES):
+                seq = SEQ.unpack_from(mm, offset)[0]
+                if seq & 1:
+                    continue
+                _, slot_hash, expires, key_len, value_len = SLOT_HEADER.unpack_from(mm, offset)
+                if slot_hash != key_hash or key_len != len(key):
+                    break
+                start = offset + PAYLOAD_OFFSET
+                payload = mm[start : start + key_len + value_len]
+                if SEQ.unpack_from(mm, offset)[0] != seq:
+                    continue
+                if payload[:key_len] != key:
+                    break
+                if expires and expires <= time.time():
+                    return None, None
+                mm[offset + REF_OFFSET] = 1
+                return payload[key_len:], expires
+        return None, None
+
+    def _store(self, table, key, pickled, expires):
+        key = key.encode()
+        if PAYLOAD_OFFSET + len(key) + len(pickled) > table.slot_size:
+            return False
+        key_hash = self._hash(key)
+        offsets = self._set_offsets(table, key_hash)
+        now = time.time()
+        victim = None
+        for offset in offsets:
+            _, slot_hash, slot_expires, key_len, _ = SLOT_HEADER.unpack_from(table.mm, offset)
+            if slot_hash == key_hash and key_len == len(key):
+                start = offset + PAYLOAD_OFFSET
+                if table.mm[start : start + key_len] == key:
+                    victim = offset
+                    break
+            if victim is None and (not key_len or (slot_expires and slot_expires <= now)):
+                victim = offset
+        if victim is None:
+            victim = self._clock_victim(table, offsets)
+        self._write_slot(table, victim, key_hash, expires or 0.0, key, pickled)
+        return True
+
+    @staticmethod
+    def _clock_victim(table, offsets):
+        # Second-chance sweep: clear reference bits until an unreferenced slot
+        # turns up. The second pass always finds one.
+        mm = table.mm
+        for offset in offsets + offsets:
+            if mm[offset + REF_OFFSET]:
+                mm[offset + REF_OFFSET] = 0
+            else:
+                return offset
+
+    def _delete(self, table, key):
+        key = key.encode()
+        key_hash = self._hash(key)
+        for offset in self._set_offsets(table, key_hash):
+            _, slot_hash, _, key_len, _ = SLOT_HEADER.unpack_from(table.mm, offset)
+            start = offset + PAYLOAD_OFFSET
+            if slot_hash == key_hash and key_len == len(key) and table.mm[start : start + key_len] == key:
+                self._write_slot(table, offset, 0, 0.0, b"", b"")
+                return True
+        return False
+
+    @staticmethod
+    def _write_slot(table, offset, key_hash, expires, key, pickled):
+        mm = table.mm
+        seq = SEQ.unpack_from(mm, offset)[0]
+        # An odd sequence here means a writer died mid-update; step past it
+        # rather than flipping the parity of the slot for good.
+        writing = seq + 2 if seq & 1 else seq + 1
+        SEQ.pack_into(mm, offset, writing)
+        SLOT_HEADER.pack_into(mm, offset, writing, key_hash, expires, len(key), len(pickled))
+        mm[offset + REF_OFFSET] = 0
+        start = offset + PAYLOAD_OFFSET
+        mm[start : start + len(key) + len(pickled)] = key + pickled
+        SEQ.pack_into(mm, offset, writing + 1)
+
+
+class _WriteLock:
+    """Serialize writers across threads (threading lock) and processes (flock)."""
+
+    def __init__(self, table):
+        self.table = table
+
+    def __enter__(self):
+        self.table.lock.acquire()
+        fcntl.flock(self.table.fd, fcntl.LOCK_EX)
+        return self.table
+
+    def __exit__(self, *exc_info):
+        fcntl.flock(self.table.fd, fcntl.LOCK_UN)
+        self.table.lock.release()
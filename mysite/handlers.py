@@ -0,0 +1,37 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIHandler as DjangoASGIHandler
+
+_END = object()
+
+
+class ASGIHandler(DjangoASGIHandler):
+    """Django's ASGI handler, iterating streaming responses off the event loop.
+
+    Django 4.1 walks ``StreamingHttpResponse`` content on the event loop, so a
+    generator that queries the database raises ``SynchronousOnlyOperation``
+    and ``FileResponse`` blocks the loop on every read. Here each part is
+    pulled in the sync thread the view ran on, one at a time, so memory stays
+    bounded.
+    """
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+        headers = []
+        for header, value in response.items():
+            if isinstance(header, str):
+                header = header.encode("ascii")
+            if isinstance(value, str):
+                value = value.encode("latin1")
+            headers.append((bytes(header), bytes(value)))
+        for cookie in response.cookies.values():
+            headers.append((b"Set-Cookie", cookie.output(header="").encode("ascii").strip()))
+        await send({"type": "http.response.start", "status": response.status_code, "headers": headers})
+
+        parts = iter(response)
+        next_part = sync_to_async(next, thread_sensitive=True)
+        while (part := await next_part(parts, _END)) is not _END:
+            for chunk, _ in self.chunk_bytes(part):
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body"})
+        await sync_to_async(response.close, thread_sensitive=True)()
@@ -0,0 +1,54 @@
+import os
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+class Command(BaseCommand):
+    help = "Report the slowest imports of `django.setup()` for the current settings, using `python -X importtime`."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=20, help="Number of modules to show.")
+        parser.add_argument(
+            "--sort",
+            choices=["self", "cumulative"],
+            default="cumulative",
+            help="Rank modules by their own import time or including their imports.",
+        )
+        parser.add_argument("--top-level", action="store_true", help="Only show modules imported directly by setup.")
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import django; django.setup()"],
+            env=env,
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode:
+            raise CommandError("django.setup() failed:\n%s" % result.stderr[-2000:])
+
+        rows = []
+        for line in result.stderr.splitlines():
+            match = LINE_RE.match(line)
+            if match:
+                self_us, cumulative_us, indent, module = match.groups()
+                rows.append((int(self_us), int(cumulative_us), (len(indent) - 1) // 2, module))
+        count = len(rows)
+        total_us = sum(row[0] for row in rows)
+        if options["top_level"]:
+            rows = [row for row in rows if row[2] == 0]
+        key = 0 if options["sort"] == "self" else 1
+        rows.sort(key=lambda row: row[key], reverse=True)
+
+        self.stdout.write("Settings: %s" % settings.SETTINGS_MODULE)
+        self.stdout.write("%d modules imported in %.1f ms" % (count, total_us / 1000))
+        self.stdout.write("%10s %10s  %s" % ("self [ms]", "cum [ms]", "module"))
+        for self_us, cumulative_us, _, module in rows[: options["limit"]]:
+            self.stdout.write("%10.1f %10.1f  %s" % (self_us / 1000, cumulative_us / 1000, module))
@@ -0,0 +1,41 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from mysite.routers import REPLICA, record_replica_sync
+
+
+class Command(BaseCommand):
+    help = "Copy the primary SQLite database onto the replica, once or every --interval seconds."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=float, help="Keep syncing, pausing this many seconds between copies.")
+
+    def handle(self, *args, **options):
+        if REPLICA not in settings.DATABASES:
+            raise CommandError("No '%s' database is configured; set DJANGO_REPLICA_DB." % REPLICA)
+        primary, replica = settings.DATABASES["default"], settings.DATABASES[REPLICA]
+        if {primary["ENGINE"], replica["ENGINE"]} != {"django.db.backends.sqlite3"}:
+            raise CommandError("sync_replica only supports SQLite; use the database's own replication instead.")
+
+        while True:
+            started_at = time.time()
+            start = time.perf_counter()
+            source = sqlite3.connect(primary["NAME"])
+            target = sqlite3.connect(replica["NAME"])
+            try:
+                # The online backup API gives a consistent snapshot while the
+                # primary keeps serving writes.
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
+            # Everything committed before the copy started is now readable
+            # from the replica; clients pinned by older writes are released.
+            record_replica_sync(started_at)
+            self.stdout.write("Synced replica in %.1f ms" % ((time.perf_counter() - start) * 1000))
+            if options["interval"] is None:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+
+from .routers import replica_synced_at, use_primary
+
+PIN_COOKIE = "use_primary"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE")
+
+
+class ReplicaRoutingMiddleware:
+    """Let safe requests read from the replica, except right after a write.
+
+    A request that may write stores its completion time in a cookie. The
+    client keeps reading from the primary until the replica holds a snapshot
+    taken after that time, or at most ``REPLICA_PIN_SECONDS``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        writes = request.method not in SAFE_METHODS
+        token = use_primary.set(writes or not self._replicated(request.COOKIES.get(PIN_COOKIE)))
+        try:
+            response = self.get_response(request)
+        finally:
+            use_primary.reset(token)
+        if writes:
+            response.set_cookie(
+                PIN_COOKIE, repr(time.time()), max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite="Lax"
+            )
+        return response
+
+    @staticmethod
+    def _replicated(written_at):
+        if written_at is None:
+            return True
+        try:
+            written_at = float(written_at)
+        except ValueError:
+            return False
+        synced_at = replica_synced_at()
+        return synced_at is not None and synced_at > written_at
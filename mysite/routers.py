@@ -0,0 +1,42 @@
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+REPLICA = "replica"
+# Cache key holding the time.time() at which the replica's current snapshot
+# of the primary was taken.
+SYNCED_AT_KEY = "replica:synced_at"
+
+# Whether reads in the current context must see the primary. True outside of
+# requests (management commands, workers); ReplicaRoutingMiddleware clears it
+# for safe requests from clients that have not written recently.
+use_primary = ContextVar("use_primary", default=True)
+
+
+def replica_synced_at():
+    """Return when the replica's data was last copied, or None if unknown."""
+    return cache.get(SYNCED_AT_KEY)
+
+
+def record_replica_sync(timestamp):
+    cache.set(SYNCED_AT_KEY, timestamp, timeout=None)
+
+
+class PrimaryReplicaRouter:
+    """Send reads to the replica when allowed and configured, everything else to the primary."""
+
+    def db_for_read(self, model, **hints):
+        if REPLICA in settings.DATABASES and not use_primary.get():
+            return REPLICA
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is a copy of the primary, schema included.
+        return db == "default"
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -40,10 +41,12 @@ INSTALLED_APPS = [
     "accounts.apps.AccountsConfig",
     "tweets.apps.TweetsConfig",
     "welcome.apps.WelcomeConfig",
+    "mysite",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "mysite.middleware.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -83,6 +86,49 @@ DATABASES = {
     }
 }
 
+# Read replica. Set DJANGO_REPLICA_DB to the path of a second SQLite file,
+# refreshed with `python manage.py sync_replica`, to send reads there.
+if os.environ.get("DJANGO_REPLICA_DB"):
+    DATABASES["replica"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.environ["DJANGO_REPLICA_DB"],
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["mysite.routers.PrimaryReplicaRouter"]
+
+# After a write, a client reads from the primary until sync_replica has
+# copied the write, and at most this many seconds.
+REPLICA_PIN_SECONDS = 300
+
+
+# Cache
+# One cache file shared by every worker process on the host.
+
+CACHES = {
+    "default": {
+        "BACKEND": "mysite.cache.SharedMemoryCache",
+        "LOCATION": BASE_DIR / "cache.mmap",
+        "OPTIONS": {
+            "MAX_ENTRIES": 4096,
+            "SLOT_SIZE": 4096,
+        },
+    }
+}
+
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+
+
+# Live timeline (tweets.stream)
+
+# Private directory holding one datagram socket per process with open
+# streams. Keep the path short: socket paths are limited to ~100 bytes.
+TWEET_STREAM_DIR = BASE_DIR / ".tweet-stream"
+# Tweet IDs buffered per connection before the client is told to reload.
+TWEET_STREAM_QUEUE_SIZE = 100
+# Seconds between keep-alive comments on an idle connection.
+TWEET_STREAM_HEARTBEAT = 15
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
@@ -120,6 +166,23 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# Uploaded files
+
+MEDIA_ROOT = BASE_DIR / "media"
+MEDIA_URL = "media/"
+
+# Stream every upload to a temporary file in chunks instead of buffering
+# small ones in memory, and stop reading once it is over the size limit.
+FILE_UPLOAD_HANDLERS = [
+    "tweets.uploadhandler.MaxSizeUploadHandler",
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
+
+TWEET_ATTACHMENT_MAX_SIZE = 20 * 1024 * 1024
+# Processes generating thumbnails in the background; 0 generates them inline.
+TWEET_THUMBNAIL_WORKERS = 2
+TWEET_THUMBNAIL_SIZE = 320
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.0/ref/settings/#default-auto-field
 
@@ -0,0 +1,37 @@
+"""
+Django settings for batch commands and background workers.
+
+Same as ``mysite.settings`` without the apps, middleware and context
+processors that only matter when rendering pages, so that short-lived
+processes import less at startup. Select it with ``--settings`` or
+``DJANGO_SETTINGS_MODULE``:
+
+    python manage.py archive_tweets --settings=mysite.settings_batch
+"""
+
+from copy import deepcopy
+
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, TEMPLATES
+
+WEB_ONLY_APPS = [
+    "django.contrib.admin",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+    "welcome.apps.WelcomeConfig",
+]
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in WEB_ONLY_APPS]
+
+MIDDLEWARE = [
+    middleware
+    for middleware in MIDDLEWARE
+    if middleware
+    not in (
+        "django.contrib.messages.middleware.MessageMiddleware",
+        "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    )
+]
+
+TEMPLATES = deepcopy(TEMPLATES)
+TEMPLATES[0]["OPTIONS"]["context_processors"].remove("django.contrib.messages.context_processors.messages")
@@ -0,0 +1,220 @@
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import closing
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from tweets.models import Tweet
+
+from .cache import SEQ, SharedMemoryCache
+from .middleware import PIN_COOKIE, ReplicaRoutingMiddleware
+from .routers import PrimaryReplicaRouter, record_replica_sync, replica_synced_at
+
+
+def _set_in_child(location, key, value, options=None):
+    cache = SharedMemoryCache(location, {"OPTIONS": options or {}})
+    cache.set(key, value)
+
+
+class TestSharedMemoryCache(SimpleTestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.location = os.path.join(tmpdir.name, "cache")
+        self.cache = self.make_cache()
+
+    def make_cache(self, **options):
+        return SharedMemoryCache(self.location, {"OPTIONS": options})
+
+    def test_set_and_get(self):
+        self.cache.set("key", {"value": 1})
+        self.assertEqual(self.cache.get("key"), {"value": 1})
+        self.assertIsNone(self.cache.get("missing"))
+
+    def test_add_does_not_overwrite(self):
+        self.assertTrue(self.cache.add("key", 1))
+        self.assertFalse(self.cache.add("key", 2))
+        self.assertEqual(self.cache.get("key"), 1)
+
+    def test_delete_and_clear(self):
+        self.cache.set_many({"a": 1, "b": 2})
+        self.assertTrue(self.cache.delete("a"))
+        self.assertFalse(self.cache.delete("a"))
+        self.cache.clear()
+        self.assertIsNone(self.cache.get("b"))
+
+    def test_expired_entry_is_a_miss(self):
+        self.cache.set("key", 1, timeout=0)
+        self.assertIsNone(self.cache.get("key"))
+        self.assertFalse(self.cache.touch("key"))
+
+    def test_incr(self):
+        self.cache.set("key", 1)
+        self.assertEqual(self.cache.incr("key", 2), 3)
+        self.assertEqual(self.cache.get("key"), 3)
+        with self.assertRaises(ValueError):
+            self.cache.incr("missing")
+
+    def test_value_larger_than_slot_is_not_cached(self):
+        cache = self.make_cache(SLOT_SIZE=256)
+        cache.set("key", "small")
+        cache.set("key", "x" * 1000)
+        self.assertIsNone(cache.get("key"))
+
+    def test_clock_eviction_keeps_referenced_entries(self):
+        cache = self.make_cache(MAX_ENTRIES=4, WAYS=4)
+        for i in range(4):
+            cache.set(i, i)
+        cache.get(0)
+        cache.set("new", "new")
+        self.assertEqual(cache.get(0), 0)
+        self.assertEqual(cache.get("new"), "new")
+        self.assertEqual(sum(cache.has_key(i) for i in range(4)), 3)
+
+    def test_recovers_slot_left_odd_by_dead_writer(self):
+        cache = self.make_cache(MAX_ENTRIES=1, WAYS=1)
+        cache.set("key", 1)
+        table = cache._table
+        offset = cache._slot_offset(table, 0)
+        SEQ.pack_into(table.mm, offset, SEQ.unpack_from(table.mm, offset)[0] + 1)
+        self.assertIsNone(cache.get("key"))
+        cache.set("key", 2)
+        self.assertEqual(SEQ.unpack_from(table.mm, offset)[0] % 2, 0)
+        self.assertEqual(cache.get("key"), 2)
+
+    def test_shared_between_processes(self):
+        process = multiprocessing.get_context("fork").Process(
+            target=_set_in_child, args=(self.location, "key", "from child")
+        )
+        process.start()
+        process.join()
+        self.assertEqual(self.cache.get("key"), "from child")
+
+    def test_other_layout_does_not_disturb_mapped_file(self):
+        self.cache.set("key", "value")
+        process = multiprocessing.get_context("fork").Process(
+            target=_set_in_child, args=(self.location, "key", "other", {"MAX_ENTRIES": 64})
+        )
+        process.start()
+        process.join()
+        self.assertEqual(process.exitcode, 0)
+        self.assertEqual(self.cache.get("key"), "value")
+        self.assertEqual(self.make_cache(MAX_ENTRIES=64).get("key"), "other")
+
+    def test_refuses_file_with_unexpected_layout(self):
+        with open(self.cache._path, "wb") as f:
+            f.write(b"not a cache file")
+        with self.assertRaises(ValueError):
+            self.cache.get("key")
+        with open(self.cache._path, "rb") as f:
+            self.assertEqual(f.read(), b"not a cache file")
+
+
+class TestImportTimeCommand(SimpleTestCase):
+    def test_success_report(self):
+        stdout = StringIO()
+        call_command("importtime", "--limit=3", "--top-level", stdout=stdout)
+        lines = stdout.getvalue().splitlines()
+        self.assertEqual(lines[0], "Settings: mysite.settings")
+        self.assertRegex(lines[1], r"^\d+ modules imported in [\d.]+ ms$")
+        self.assertEqual(len(lines), 6)
+
+    def test_success_report_from_other_directory(self):
+        cwd = os.getcwd()
+        self.addCleanup(os.chdir, cwd)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            os.chdir(tmpdir)
+            call_command("importtime", "--limit=1", stdout=StringIO())
+
+
+@mock.patch.dict(settings.DATABASES, {"replica": {}})
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class TestReplicaRouting(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.router = PrimaryReplicaRouter()
+        cache.clear()
+
+    def read_db(self, request):
+        def get_response(request):
+            response = HttpResponse()
+            response.read_db = self.router.db_for_read(Tweet)
+            return response
+
+        return ReplicaRoutingMiddleware(get_response)(request)
+
+    def get(self, written_at=None):
+        request = self.factory.get("/")
+        if written_at is not None:
+            request.COOKIES[PIN_COOKIE] = written_at
+        return self.read_db(request).read_db
+
+    def test_get_reads_from_replica(self):
+        response = self.read_db(self.factory.get("/"))
+        self.assertEqual(response.read_db, "replica")
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_post_reads_from_primary_and_pins_client(self):
+        response = self.read_db(self.factory.post("/"))
+        self.assertEqual(response.read_db, "default")
+        self.assertEqual(response.cookies[PIN_COOKIE]["max-age"], settings.REPLICA_PIN_SECONDS)
+        self.assertAlmostEqual(float(response.cookies[PIN_COOKIE].value), time.time(), delta=5)
+
+    def test_pinned_client_reads_from_primary_until_replica_has_synced(self):
+        written_at = repr(time.time())
+        self.assertEqual(self.get(written_at), "default")
+        record_replica_sync(float(written_at) - 1)
+        self.assertEqual(self.get(written_at), "default")
+        record_replica_sync(float(written_at) + 1)
+        self.assertEqual(self.get(written_at), "replica")
+
+    def test_invalid_pin_reads_from_primary(self):
+        record_replica_sync(time.time())
+        self.assertEqual(self.get("x"), "default")
+
+    def test_outside_requests_reads_from_primary(self):
+        self.assertEqual(self.router.db_for_read(Tweet), "default")
+
+    def test_writes_go_to_primary(self):
+        self.read_db(self.factory.get("/"))
+        self.assertEqual(self.router.db_for_write(Tweet), "default")
+        self.assertFalse(self.router.allow_migrate("replica", "tweets"))
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class TestSyncReplicaCommand(SimpleTestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.primary = os.path.join(tmpdir.name, "primary.sqlite3")
+        self.replica = os.path.join(tmpdir.name, "replica.sqlite3")
+        cache.clear()
+
+    def test_success_sync(self):
+        with closing(sqlite3.connect(self.primary)) as primary, primary:
+            primary.execute("CREATE TABLE tweet (content TEXT)")
+            primary.execute("INSERT INTO tweet VALUES ('hello')")
+        databases = {
+            "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": self.primary},
+            "replica": {"ENGINE": "django.db.backends.sqlite3", "NAME": self.replica},
+        }
+        started_at = time.time()
+        with mock.patch.dict(settings.DATABASES, databases):
+            call_command("sync_replica", stdout=StringIO())
+
+        with closing(sqlite3.connect(self.replica)) as replica:
+            self.assertEqual(replica.execute("SELECT content FROM tweet").fetchall(), [("hello",)])
+        self.assertGreaterEqual(replica_synced_at(), started_at)
+
+    def test_failure_without_replica(self):
+        with self.assertRaisesMessage(CommandError, "No 'replica' database is configured"):
+            call_command("sync_replica")
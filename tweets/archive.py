@@ -0,0 +1,60 @@
+from django.db import transaction
+from django.db.models import F
+from django.http import Http404
+
+from .models import ArchivedTweet, Attachment, Tweet
+
+TWEETS_PER_PAGE = 20
+
+
+def archive_tweets(before, batch_size=1000):
+    """Move tweets created before ``before`` into the archive table.
+
+    Each batch is copied and deleted in its own transaction, so the hot table
+    is never locked for long. Attachments are repointed at the archived copy
+    of their tweet. Returns the number of tweets moved.
+    """
+    moved = 0
+    while True:
+        with transaction.atomic():
+            batch = list(Tweet.objects.filter(created_at__lt=before).order_by("pk")[:batch_size])
+            if not batch:
+                return moved
+            ArchivedTweet.objects.bulk_create(
+                ArchivedTweet(id=tweet.pk, user_id=tweet.user_id, content=tweet.content, created_at=tweet.created_at)
+                for tweet in batch
+            )
+            pks = [tweet.pk for tweet in batch]
+            # Archived tweets keep their primary key. The assignments are in
+            # this order because MySQL applies them left to right.
+            Attachment.objects.filter(tweet_id__in=pks).update(archived_tweet_id=F("tweet_id"), tweet=None)
+            Tweet.objects.filter(pk__in=pks).delete()
+        moved += len(batch)
+
+
+def get_tweet_or_404(pk):
+    """Look a tweet up in the hot table first, then in the archive."""
+    for model in (Tweet, ArchivedTweet):
+        try:
+            return model.objects.select_related("user").get(pk=pk)
+        except model.DoesNotExist:
+            pass
+    raise Http404("No tweet matches the given query.")
+
+
+def user_tweets_page(user, page, per_page=TWEETS_PER_PAGE):
+    """Return ``(tweets, has_next)`` for one page of ``user``'s tweets, newest first.
+
+    Every archived tweet is older than every hot one, so the archive is only
+    queried once a page runs past the hot rows.
+    """
+    start = (page - 1) * per_page
+    hot = Tweet.objects.filter(user=user).select_related("user")
+    tweets = list(hot[start : start + per_page + 1])
+    if len(tweets) > per_page:
+        return tweets[:per_page], True
+    hot_count = start + len(tweets) if tweets else hot.count()
+    archive_start = max(start - hot_count, 0)
+    archived = ArchivedTweet.objects.filter(user=user).select_related("user")
+    tweets += archived[archive_start : archive_start + per_page - len(tweets) + 1]
+    return tweets[:per_page], len(tweets) > per_page
@@ -0,0 +1,26 @@
+from django import forms
+from django.conf import settings
+
+from .models import Attachment
+
+
+class AttachmentForm(forms.ModelForm):
+    class Meta:
+        model = Attachment
+        fields = ["file"]
+
+    def __init__(self, *args, upload_stopped=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        # MaxSizeUploadHandler dropped the file before it reached the form.
+        self.upload_stopped = upload_stopped
+        if upload_stopped:
+            self.fields["file"].required = False
+
+    def clean_file(self):
+        file = self.cleaned_data["file"]
+        if self.upload_stopped or file.size > settings.TWEET_ATTACHMENT_MAX_SIZE:
+            raise forms.ValidationError(
+                "ファイルサイズは %(max)d MB 以下にしてください。",
+                params={"max": settings.TWEET_ATTACHMENT_MAX_SIZE // (1024 * 1024)},
+            )
+        return file
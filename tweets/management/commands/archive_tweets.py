@@ -0,0 +1,19 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tweets.archive import archive_tweets
+
+
+class Command(BaseCommand):
+    help = "Move tweets older than the given number of days into the archive table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=30, help="Archive tweets older than this many days.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Tweets moved per transaction.")
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options["days"])
+        moved = archive_tweets(before, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS("Archived %d tweets created before %s." % (moved, before)))
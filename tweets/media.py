@@ -0,0 +1,161 @@
+"""Type detection, background thumbnailing and byte-range serving of tweet attachments.
+
+Files are served from the site's own origin, so the browser-supplied type is
+never trusted: only files Pillow recognises as one of ``IMAGE_TYPES`` are
+served inline, everything else as an ``application/octet-stream`` download.
+
+Under a WSGI server with ``wsgi.file_wrapper`` (e.g. gunicorn) files are sent
+with ``sendfile()``. Under ASGI there is no zero-copy path; ``mysite.handlers``
+reads them in chunks off the event loop.
+"""
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import get_context
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import connections
+from django.http import FileResponse, HttpResponse
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# Pillow format name -> MIME type, for images served inline and thumbnailed.
+IMAGE_TYPES = {
+    "JPEG": "image/jpeg",
+    "PNG": "image/png",
+    "GIF": "image/gif",
+    "WEBP": "image/webp",
+}
+DOWNLOAD_TYPE = "application/octet-stream"
+
+_executor = None
+
+
+def detect_content_type(file):
+    """Return the MIME type to store for an uploaded ``file``, judged by its content."""
+    from PIL import Image
+
+    try:
+        with Image.open(file) as image:
+            image_format = image.format
+    except (OSError, Image.DecompressionBombError):
+        image_format = None
+    finally:
+        file.seek(0)
+    return IMAGE_TYPES.get(image_format, DOWNLOAD_TYPE)
+
+
+def is_image(content_type):
+    return content_type in IMAGE_TYPES.values()
+
+
+def make_thumbnail(source, destination, size):
+    """Write a JPEG thumbnail of ``source`` to ``destination``. Runs in a worker process."""
+    from PIL import Image
+
+    try:
+        with Image.open(source) as image:
+            image.thumbnail((size, size))
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            image.convert("RGB").save(destination, "JPEG", quality=85)
+    except (OSError, Image.DecompressionBombError):
+        return False
+    return True
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        # spawn: forking a threaded server process is not safe.
+        _executor = ProcessPoolExecutor(max_workers=settings.TWEET_THUMBNAIL_WORKERS, mp_context=get_context("spawn"))
+    return _executor
+
+
+def _thumbnail_done(pk, name, future):
+    from .models import Attachment
+
+    if future.exception() is None and future.result():
+        try:
+            Attachment.objects.filter(pk=pk).update(thumbnail=name)
+        finally:
+            # This runs on the executor's thread, which has its own connection.
+            connections.close_all()
+
+
+def schedule_thumbnail(attachment):
+    """Generate a thumbnail for an image attachment without blocking the request."""
+    if not is_image(attachment.content_type):
+        return
+    name = "thumbnails/%d.jpg" % attachment.pk
+    args = (attachment.file.path, default_storage.path(name), settings.TWEET_THUMBNAIL_SIZE)
+    if not settings.TWEET_THUMBNAIL_WORKERS:
+        if make_thumbnail(*args):
+            type(attachment).objects.filter(pk=attachment.pk).update(thumbnail=name)
+        return
+    future = _get_executor().submit(make_thumbnail, *args)
+    future.add_done_callback(partial(_thumbnail_done, attachment.pk, name))
+
+
+class _RangeFile:
+    """Expose ``length`` bytes of ``file`` from its current position.
+
+    ``fileno()`` and ``tell()`` are passed through so that a WSGI server's
+    ``wsgi.file_wrapper`` (e.g. gunicorn) can still ``sendfile()`` the range,
+    bounded by the Content-Length header.
+    """
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+def ranged_file_response(request, path, content_type, filename=None):
+    """Serve ``path`` like ``FileResponse``, honoring a single-range ``Range`` header.
+
+    With ``filename``, the file is sent as a download rather than inline.
+    """
+    options = {"content_type": content_type, "as_attachment": filename is not None, "filename": filename or ""}
+    size = os.path.getsize(path)
+    match = RANGE_RE.match(request.headers.get("Range", ""))
+    if request.method != "GET" or not match or match.groups() == ("", ""):
+        response = FileResponse(open(path, "rb"), **options)
+        response["Accept-Ranges"] = "bytes"
+        return response
+
+    first, last = match.groups()
+    if first:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    else:
+        start, end = max(size - int(last), 0), size - 1
+    if start > end or start >= size:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = "bytes */%d" % size
+        return response
+
+    file = open(path, "rb")
+    file.seek(start)
+    length = end - start + 1
+    response = FileResponse(_RangeFile(file, length), status=206, **options)
+    response["Content-Length"] = length
+    response["Content-Range"] = "bytes %d-%d/%d" % (start, end, size)
+    response["Accept-Ranges"] = "bytes"
+    return response
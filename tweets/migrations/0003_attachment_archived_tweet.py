@@ -0,0 +1,42 @@
+# Generated by Django 4.1.13 on 2026-10-19 13:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tweets", "0002_attachment"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="attachment",
+            name="archived_tweet",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="attachments",
+                to="tweets.archivedtweet",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="attachment",
+            name="tweet",
+            field=models.ForeignKey(
+                null=True, on_delete=django.db.models.deletion.CASCADE, related_name="attachments", to="tweets.tweet"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="attachment",
+            constraint=models.CheckConstraint(
+                check=models.Q(
+                    models.Q(("archived_tweet__isnull", True), ("tweet__isnull", False)),
+                    models.Q(("archived_tweet__isnull", False), ("tweet__isnull", True)),
+                    _connector="OR",
+                ),
+                name="attachment_has_one_tweet",
+            ),
+        ),
+    ]
@@ -1,4 +1,56 @@
-# from django.db import models
+from django.conf import settings
+from django.db import models
 
-# class Tweet(models.Model):
-#     pass
+
+class Tweet(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="tweets")
+    content = models.CharField(max_length=140)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return self.content
+
+
+class ArchivedTweet(models.Model):
+    """Tweets moved out of the hot ``Tweet`` table by ``archive_tweets``.
+
+    Rows keep the primary key they had as a ``Tweet`` so that URLs stay valid.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="archived_tweets")
+    content = models.CharField(max_length=140)
+    created_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return self.content
+
+
+class Attachment(models.Model):
+    # Exactly one is set; ``archive_tweets`` moves attachments along with their tweet.
+    tweet = models.ForeignKey(Tweet, on_delete=models.CASCADE, null=True, related_name="attachments")
+    archived_tweet = models.ForeignKey(ArchivedTweet, on_delete=models.CASCADE, null=True, related_name="attachments")
+    file = models.FileField(upload_to="attachments/%Y/%m/%d/")
+    # Filled in by a background worker once the thumbnail has been generated.
+    thumbnail = models.FileField(upload_to="thumbnails/", blank=True)
+    content_type = models.CharField(max_length=100)
+    size = models.PositiveBigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(tweet__isnull=False, archived_tweet__isnull=True)
+                | models.Q(tweet__isnull=True, archived_tweet__isnull=False),
+                name="attachment_has_one_tweet",
+            ),
+        ]
+
+    def __str__(self):
+        return self.file.name
@@ -0,0 +1,113 @@
+"""Fan-out of new tweet IDs to the live timeline connections.
+
+Every process with open connections binds a Unix datagram socket in
+``TWEET_STREAM_DIR``. Publishing sends the tweet ID to each socket found
+there, so a tweet posted through any worker reaches the connections held by
+every other worker on the host without an external broker. Inside a process
+each connection has a bounded queue; a client that falls behind has its
+backlog dropped and is told to reload instead of growing without bound.
+"""
+
+import asyncio
+import itertools
+import os
+import socket
+from pathlib import Path
+
+from django.conf import settings
+
+# Queued in place of the dropped backlog of a client that fell behind.
+RESET = "reset"
+
+_socket_ids = itertools.count()
+
+
+class Subscription:
+    def __init__(self, maxsize):
+        self.queue = asyncio.Queue(maxsize)
+
+    def put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESET)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class Broker:
+    def __init__(self):
+        self._subscriptions = set()
+        self._sock = None
+        self._path = None
+        self._loop = None
+
+    @property
+    def directory(self):
+        return Path(settings.TWEET_STREAM_DIR)
+
+    def subscribe(self):
+        """Register a connection. Must be called from the event loop serving it."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._listen(loop)
+        subscription = Subscription(settings.TWEET_STREAM_QUEUE_SIZE)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self._subscriptions.discard(subscription)
+        if not self._subscriptions:
+            self._close()
+
+    def publish(self, tweet_id):
+        """Send ``tweet_id`` to every listening process. Safe from any thread."""
+        payload = str(tweet_id).encode()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sender:
+            sender.setblocking(False)
+            for path in self.directory.glob("*.sock"):
+                try:
+                    sender.sendto(payload, str(path))
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # Left behind by a process that exited without cleaning up.
+                    path.unlink(missing_ok=True)
+                except BlockingIOError:
+                    # That process is not draining its socket; it misses this one.
+                    pass
+
+    def _listen(self, loop):
+        self._close()
+        # Only this user may bind or send here; chmod() also fails loudly on
+        # a directory someone else created.
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        self.directory.chmod(0o700)
+        self._path = self.directory / ("%d-%d.sock" % (os.getpid(), next(_socket_ids)))
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.bind(str(self._path))
+        self._sock.setblocking(False)
+        loop.add_reader(self._sock.fileno(), self._receive)
+        self._loop = loop
+
+    def _close(self):
+        if self._sock is None:
+            return
+        if not self._loop.is_closed():
+            self._loop.remove_reader(self._sock.fileno())
+        self._sock.close()
+        self._path.unlink(missing_ok=True)
+        self._sock = self._path = self._loop = None
+
+    def _receive(self):
+        while True:
+            try:
+                tweet_id = int(self._sock.recv(32))
+            except BlockingIOError:
+                return
+            for subscription in self._subscriptions:
+                subscription.put(tweet_id)
+
+
+broker = Broker()
@@ -0,0 +1,12 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import Tweet
+from .pubsub import broker
+
+
+@receiver(post_save, sender=Tweet)
+def publish_new_tweet(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: broker.publish(instance.pk))
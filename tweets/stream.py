@@ -0,0 +1,85 @@
+"""Server-sent events endpoint for live timeline updates.
+
+This is a plain ASGI application mounted in ``mysite.asgi`` rather than a
+Django view: Django 4.1 iterates streaming responses synchronously, which
+would tie up a thread per open connection.
+"""
+
+import asyncio
+from importlib import import_module
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.http import HttpRequest, parse_cookie
+
+from .pubsub import RESET, broker
+
+STREAM_PATH = "/tweets/stream/"
+
+
+def _is_authenticated(session_key):
+    request = HttpRequest()
+    request.session = import_module(settings.SESSION_ENGINE).SessionStore(session_key)
+    return get_user(request).is_authenticated
+
+
+async def _send_event(send, data):
+    await send({"type": "http.response.body", "body": data.encode(), "more_body": True})
+
+
+async def _wait_for_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def stream_events(receive, send, subscription):
+    """Write events from ``subscription`` to the client until it disconnects."""
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),
+            ],
+        }
+    )
+    await _send_event(send, ": connected\n\n")
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+    try:
+        while True:
+            message = asyncio.ensure_future(subscription.get())
+            done, _ = await asyncio.wait(
+                {message, disconnected},
+                timeout=settings.TWEET_STREAM_HEARTBEAT,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if disconnected in done:
+                message.cancel()
+                return
+            if message not in done:
+                # Keep proxies from closing an idle connection.
+                message.cancel()
+                await _send_event(send, ": ping\n\n")
+            elif message.result() == RESET:
+                await _send_event(send, "event: reset\ndata: \n\n")
+            else:
+                await _send_event(send, "data: %d\n\n" % message.result())
+    finally:
+        disconnected.cancel()
+
+
+async def tweet_stream(scope, receive, send):
+    headers = dict(scope["headers"])
+    cookies = parse_cookie(headers.get(b"cookie", b"").decode("latin-1"))
+    if not await sync_to_async(_is_authenticated)(cookies.get(settings.SESSION_COOKIE_NAME)):
+        await send({"type": "http.response.start", "status": 403, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+        return
+    subscription = broker.subscribe()
+    try:
+        await stream_events(receive, send, subscription)
+    finally:
+        broker.unsubscribe(subscription)
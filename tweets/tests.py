@@ -1,5 +1,28 @@
-from django.test import TestCase
+import asyncio
+import io
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from .archive import user_tweets_page
+from .models import ArchivedTweet, Attachment, Tweet
+from .pubsub import RESET, Subscription
+from .stream import STREAM_PATH, tweet_stream
+
+User = get_user_model()
 
 
 class TestHomeView(TestCase):
@@ -23,8 +46,25 @@ class TestTweetCreateView(TestCase):
 
 
 class TestTweetDetailView(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="test", email="test@example.com", password="testuser")
+        self.client.force_login(self.user)
+
     def test_success_get(self):
-        pass
+        tweet = Tweet.objects.create(user=self.user, content="hello")
+        response = self.client.get(reverse("tweets:detail", kwargs={"pk": tweet.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["tweet"], tweet)
+
+    def test_success_get_archived_tweet(self):
+        tweet = ArchivedTweet.objects.create(id=1, user=self.user, content="old", created_at=timezone.now())
+        response = self.client.get(reverse("tweets:detail", kwargs={"pk": tweet.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["tweet"], tweet)
+
+    def test_failure_get_with_not_exist_tweet(self):
+        response = self.client.get(reverse("tweets:detail", kwargs={"pk": 100}))
+        self.assertEqual(response.status_code, 404)
 
 
 class TestTweetDeleteView(TestCase):
@@ -58,3 +98,229 @@ class TestUnfavoriteView(TestCase):
 
     def test_failure_post_with_unfavorited_tweet(self):
         pass
+
+
+class TestArchiveTweetsCommand(TestCase):
+    def test_success_archive_old_tweets(self):
+        user = User.objects.create_user(username="test", email="test@example.com", password="testuser")
+        old = Tweet.objects.create(user=user, content="old")
+        with_attachment = Tweet.objects.create(user=user, content="with attachment")
+        Attachment.objects.create(tweet=with_attachment, file="data.bin", content_type="text/plain", size=0)
+        Tweet.objects.filter(pk__in=[old.pk, with_attachment.pk]).update(
+            created_at=timezone.now() - timedelta(days=40)
+        )
+        new = Tweet.objects.create(user=user, content="new")
+
+        call_command("archive_tweets", "--days=30", "--batch-size=1", stdout=StringIO())
+
+        self.assertQuerysetEqual(Tweet.objects.all(), [new])
+        archived = ArchivedTweet.objects.get(pk=old.pk)
+        self.assertEqual((archived.user, archived.content), (user, "old"))
+        attachment = Attachment.objects.get()
+        self.assertEqual((attachment.tweet, attachment.archived_tweet_id), (None, with_attachment.pk))
+
+        self.client.force_login(user)
+        response = self.client.get(reverse("tweets:detail", kwargs={"pk": with_attachment.pk}))
+        self.assertContains(response, reverse("tweets:attachment", kwargs={"pk": attachment.pk}))
+
+
+class TestUserTweetsPage(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="test", email="test@example.com", password="testuser")
+        self.hot = [Tweet.objects.create(user=self.user, content="hot %d" % i) for i in range(3)][::-1]
+        old = timezone.now() - timedelta(days=100)
+        self.archived = [
+            ArchivedTweet.objects.create(
+                id=100 + i, user=self.user, content="old %d" % i, created_at=old - timedelta(i)
+            )
+            for i in range(3)
+        ]
+
+    def test_page_within_hot_rows_does_not_query_archive(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(user_tweets_page(self.user, 1, per_page=2), (self.hot[:2], True))
+
+    def test_page_spanning_both_tables(self):
+        with self.assertNumQueries(2):
+            self.assertEqual(user_tweets_page(self.user, 2, per_page=2), ([self.hot[2], self.archived[0]], True))
+
+    def test_page_past_hot_rows(self):
+        self.assertEqual(user_tweets_page(self.user, 3, per_page=2), (self.archived[1:], False))
+        self.assertEqual(user_tweets_page(self.user, 4, per_page=2), ([], False))
+
+
+class TestTweetStream(TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        override = override_settings(TWEET_STREAM_DIR=Path(tmpdir.name) / "stream")
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user = User.objects.create_user(username="test", email="test@example.com", password="testuser")
+
+    async def open_stream(self, cookie=""):
+        self.received = asyncio.Queue()
+        self.sent = []
+        self.got_data = asyncio.Event()
+
+        async def send(message):
+            self.sent.append(message)
+            if b"data:" in message.get("body", b""):
+                self.got_data.set()
+
+        scope = {"type": "http", "path": STREAM_PATH, "headers": [(b"cookie", cookie.encode())]}
+        await self.received.put({"type": "http.request", "body": b""})
+        return asyncio.ensure_future(tweet_stream(scope, self.received.get, send))
+
+    async def wait_for_messages(self, count):
+        while len(self.sent) < count:
+            await asyncio.sleep(0.01)
+
+    async def test_success_stream_new_tweet(self):
+        await sync_to_async(self.client.force_login)(self.user)
+        cookie = "%s=%s" % (settings.SESSION_COOKIE_NAME, self.client.cookies[settings.SESSION_COOKIE_NAME].value)
+        task = await self.open_stream(cookie)
+        await asyncio.wait_for(self.wait_for_messages(2), timeout=5)
+        self.assertEqual(self.sent[0]["status"], 200)
+
+        def create_tweet():
+            with self.captureOnCommitCallbacks(execute=True):
+                return Tweet.objects.create(user=self.user, content="hello")
+
+        tweet = await sync_to_async(create_tweet)()
+        await asyncio.wait_for(self.got_data.wait(), timeout=5)
+        self.assertEqual(self.sent[-1]["body"], b"data: %d\n\n" % tweet.pk)
+
+        await self.received.put({"type": "http.disconnect"})
+        await asyncio.wait_for(task, timeout=5)
+        self.assertEqual(list(Path(settings.TWEET_STREAM_DIR).iterdir()), [])
+        self.assertEqual(Path(settings.TWEET_STREAM_DIR).stat().st_mode & 0o777, 0o700)
+
+    async def test_failure_stream_without_login(self):
+        task = await self.open_stream()
+        await asyncio.wait_for(task, timeout=5)
+        self.assertEqual(self.sent[0]["status"], 403)
+
+
+class TestSubscription(SimpleTestCase):
+    def test_overflow_replaces_backlog_with_reset(self):
+        async def fill():
+            subscription = Subscription(maxsize=2)
+            for tweet_id in range(3):
+                subscription.put(tweet_id)
+            return [subscription.queue.get_nowait() for _ in range(subscription.queue.qsize())]
+
+        self.assertEqual(asyncio.run(fill()), [RESET])
+
+
+class TestAttachmentViews(TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        override = override_settings(MEDIA_ROOT=tmpdir.name, TWEET_THUMBNAIL_WORKERS=0)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user = User.objects.create_user(username="test", email="test@example.com", password="testuser")
+        self.client.force_login(self.user)
+        self.tweet = Tweet.objects.create(user=self.user, content="hello")
+
+    def upload(self, name, content, content_type):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                reverse("tweets:attachment_create", kwargs={"pk": self.tweet.pk}),
+                {"file": SimpleUploadedFile(name, content, content_type=content_type)},
+            )
+
+    def test_success_post_image_with_thumbnail(self):
+        image = io.BytesIO()
+        Image.new("RGB", (800, 600), "red").save(image, "PNG")
+        response = self.upload("red.png", image.getvalue(), "image/png")
+        self.assertRedirects(response, reverse("tweets:detail", kwargs={"pk": self.tweet.pk}))
+        attachment = Attachment.objects.get()
+        self.assertEqual((attachment.tweet, attachment.size), (self.tweet, len(image.getvalue())))
+
+        response = self.client.get(reverse("tweets:attachment_thumbnail", kwargs={"pk": attachment.pk}))
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        with Image.open(io.BytesIO(b"".join(response.streaming_content))) as thumbnail:
+            self.assertEqual(thumbnail.size, (320, 240))
+
+    def test_success_detect_image_type_from_content(self):
+        image = io.BytesIO()
+        Image.new("RGB", (8, 8), "red").save(image, "PNG")
+        self.upload("red.txt", image.getvalue(), "text/plain")
+        attachment = Attachment.objects.get()
+        self.assertEqual(attachment.content_type, "image/png")
+
+        response = self.client.get(reverse("tweets:attachment", kwargs={"pk": attachment.pk}))
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertTrue(response["Content-Disposition"].startswith("inline;"))
+
+    def test_success_serve_non_image_as_download(self):
+        self.upload("evil.html", b"<script>alert(1)</script>", "text/html")
+        attachment = Attachment.objects.get()
+        self.assertEqual(attachment.content_type, "application/octet-stream")
+        self.assertFalse(attachment.thumbnail)
+
+        url = reverse("tweets:attachment", kwargs={"pk": attachment.pk})
+        for headers in ({}, {"HTTP_RANGE": "bytes=0-7"}):
+            response = self.client.get(url, **headers)
+            self.assertEqual(response["Content-Type"], "application/octet-stream")
+            self.assertTrue(response["Content-Disposition"].startswith("attachment;"))
+
+    def test_success_serve_stored_non_image_type_as_download(self):
+        self.upload("evil.html", b"<script>alert(1)</script>", "text/html")
+        Attachment.objects.update(content_type="text/html")
+        response = self.client.get(reverse("tweets:attachment", kwargs={"pk": Attachment.objects.get().pk}))
+        self.assertEqual(response["Content-Type"], "application/octet-stream")
+        self.assertTrue(response["Content-Disposition"].startswith("attachment;"))
+
+    def test_success_get_range(self):
+        self.upload("data.bin", bytes(range(256)), "application/octet-stream")
+        url = reverse("tweets:attachment", kwargs={"pk": Attachment.objects.get().pk})
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(b"".join(response.streaming_content), bytes(range(256)))
+
+        response = self.client.get(url, HTTP_RANGE="bytes=10-19")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 10-19/256")
+        self.assertEqual(response["Content-Length"], "10")
+        self.assertEqual(b"".join(response.streaming_content), bytes(range(10, 20)))
+
+        response = self.client.get(url, HTTP_RANGE="bytes=-6")
+        self.assertEqual(b"".join(response.streaming_content), bytes(range(250, 256)))
+
+    def test_failure_get_with_unsatisfiable_range(self):
+        self.upload("data.bin", b"abc", "application/octet-stream")
+        url = reverse("tweets:attachment", kwargs={"pk": Attachment.objects.get().pk})
+        response = self.client.get(url, HTTP_RANGE="bytes=3-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */3")
+
+    def test_failure_post_with_incorrect_user(self):
+        other = User.objects.create_user(username="other", email="other@example.com", password="testuser")
+        self.tweet.user = other
+        self.tweet.save()
+        response = self.upload("data.bin", b"abc", "application/octet-stream")
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Attachment.objects.exists())
+
+    def test_failure_post_with_too_large_file(self):
+        max_size = 1024 * 1024
+        received = []
+        receive_data_chunk = TemporaryFileUploadHandler.receive_data_chunk
+
+        def receive(handler, raw_data, start):
+            received.append(len(raw_data))
+            return receive_data_chunk(handler, raw_data, start)
+
+        with override_settings(TWEET_ATTACHMENT_MAX_SIZE=max_size), mock.patch.object(
+            TemporaryFileUploadHandler, "receive_data_chunk", receive
+        ):
+            response = self.upload("data.bin", bytes(4 * max_size), "application/octet-stream")
+        self.assertEqual(response.status_code, 200)
+        self.assertFormError(response.context["form"], "file", "ファイルサイズは 1 MB 以下にしてください。")
+        self.assertLessEqual(sum(received), max_size)
+        self.assertFalse(Attachment.objects.exists())
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+
+
+class MaxSizeUploadHandler(FileUploadHandler):
+    """Stop reading the request once a file passes ``TWEET_ATTACHMENT_MAX_SIZE``.
+
+    Listed before the handler that stores uploads, so an oversized file never
+    fills the temporary directory. The rest of the body is left unread and the
+    file is dropped; ``stopped`` tells the view to report why.
+    """
+
+    stopped = False
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.TWEET_ATTACHMENT_MAX_SIZE:
+            self.stopped = True
+            raise StopUpload(connection_reset=True)
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
@@ -6,7 +6,14 @@ app_name = "tweets"
 urlpatterns = [
     path("home/", views.HomeView.as_view(), name="home"),
     # path('create/', views.TweetCreateView.as_view(), name='create'),
-    # path('<int:pk>/', views.TweetDetailView.as_view(), name='detail'),
+    path("<int:pk>/", views.TweetDetailView.as_view(), name="detail"),
+    path("<int:pk>/attachments/", views.AttachmentCreateView.as_view(), name="attachment_create"),
+    path("attachments/<int:pk>/", views.AttachmentView.as_view(), name="attachment"),
+    path(
+        "attachments/<int:pk>/thumbnail/",
+        views.AttachmentView.as_view(thumbnail=True),
+        name="attachment_thumbnail",
+    ),
     # path('<int:pk>/delete/', views.TweetDeleteView.as_view(), name='delete'),
     # path('<int:pk>/like/', views.LikeView, name='like'),
     # path('<int:pk>/unlike/', views.UnlikeView, name='unlike'),
@@ -1,6 +1,80 @@
+import os
+
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.views.generic import TemplateView
+from django.db import transaction
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.views.generic import CreateView, DetailView, ListView, View
+
+from .archive import TWEETS_PER_PAGE, get_tweet_or_404
+from .forms import AttachmentForm
+from .media import DOWNLOAD_TYPE, detect_content_type, is_image, ranged_file_response, schedule_thumbnail
+from .models import Attachment, Tweet
+from .uploadhandler import MaxSizeUploadHandler
 
 
-class HomeView(LoginRequiredMixin, TemplateView):
+class HomeView(LoginRequiredMixin, ListView):
     template_name = "tweets/home.html"
+    context_object_name = "tweets"
+    queryset = Tweet.objects.select_related("user")
+    paginate_by = TWEETS_PER_PAGE
+
+
+class TweetDetailView(LoginRequiredMixin, DetailView):
+    template_name = "tweets/detail.html"
+    context_object_name = "tweet"
+
+    def get_object(self, queryset=None):
+        return get_tweet_or_404(self.kwargs["pk"])
+
+
+class AttachmentCreateView(LoginRequiredMixin, CreateView):
+    form_class = AttachmentForm
+    template_name = "tweets/attachment_form.html"
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            self.tweet = get_object_or_404(Tweet, pk=self.kwargs["pk"], user=request.user)
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx["tweet"] = self.tweet
+        return ctx
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        if self.request.method == "POST":
+            kwargs["upload_stopped"] = any(
+                isinstance(handler, MaxSizeUploadHandler) and handler.stopped
+                for handler in self.request.upload_handlers
+            )
+        return kwargs
+
+    def form_valid(self, form):
+        upload = form.cleaned_data["file"]
+        form.instance.tweet = self.tweet
+        form.instance.content_type = detect_content_type(upload)
+        form.instance.size = upload.size
+        response = super().form_valid(form)
+        transaction.on_commit(lambda: schedule_thumbnail(self.object))
+        return response
+
+    def get_success_url(self):
+        return reverse("tweets:detail", kwargs={"pk": self.tweet.pk})
+
+
+class AttachmentView(LoginRequiredMixin, View):
+    thumbnail = False
+
+    def get(self, request, *args, **kwargs):
+        attachment = get_object_or_404(Attachment, pk=self.kwargs["pk"])
+        if self.thumbnail:
+            if not attachment.thumbnail:
+                raise Http404("The thumbnail has not been generated yet.")
+            return ranged_file_response(request, attachment.thumbnail.path, "image/jpeg")
+        if is_image(attachment.content_type):
+            return ranged_file_response(request, attachment.file.path, attachment.content_type)
+        filename = os.path.basename(attachment.file.name)
+        return ranged_file_response(request, attachment.file.path, DOWNLOAD_TYPE, filename=filename)